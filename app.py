@@ -1,14 +1,24 @@
+import asyncio
+from collections import deque
+from itertools import islice
+
 import streamlit as st
 from datetime import datetime
 from dataclasses import dataclass
-from typing import List, Dict, Any
 
 # Import renamed modules
 from pipeline import RAGPipeline
 from web import TechNewsRetriever
-from vector import VectorStore
+from vector import VectorStore, get_vector_store
+
+
+@st.cache_resource
+def load_vector_store() -> VectorStore:
+    """Shared VectorStore so Streamlit reruns do not reload the embedding model"""
+    return get_vector_store()
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TechUpdate:
     title: str
     content: str
@@ -21,11 +31,12 @@ class TechRAGApp:
     def __init__(self):
         self.rag_pipeline = RAGPipeline()
         self.news_retriever = TechNewsRetriever()
-        self.vector_store = VectorStore()
+        self.vector_store = load_vector_store()
 
     def initialize_session_state(self):
         if 'chat_history' not in st.session_state:
-            st.session_state.chat_history = []
+            # Bounded so history memory stays flat over a long session
+            st.session_state.chat_history = deque(maxlen=20)
         if 'latest_updates' not in st.session_state:
             st.session_state.latest_updates = []
         if 'vector_store_ready' not in st.session_state:
@@ -35,14 +46,11 @@ class TechRAGApp:
 
     def fetch_latest_tech_news(self):
         with st.spinner("Fetching latest tech updates..."):
-            sources = ["hackernews", "techcrunch", "github_trending", "reddit_programming"]
-            all_updates = []
-            for source in sources:
-                try:
-                    updates = self.news_retriever.fetch_from_source(source)
-                    all_updates.extend(updates)
-                except Exception as e:
-                    st.error(f"Error fetching from {source}: {e}")
+            try:
+                all_updates = asyncio.run(self.news_retriever.fetch_all_async())
+            except Exception as e:
+                st.error(f"Error fetching tech updates: {e}")
+                all_updates = []
 
             if all_updates:
                 self.vector_store.add_documents(all_updates)
@@ -50,16 +58,6 @@ class TechRAGApp:
                 st.session_state.vector_store_ready = True
                 st.success(f"Loaded {len(all_updates)} tech updates.")
 
-    def process_query(self, query: str) -> str:
-        if not st.session_state.vector_store_ready:
-            return "Please fetch latest tech updates first."
-        relevant_docs = self.vector_store.similarity_search(query, k=5)
-
-        if st.session_state.response_style == 'Structured':
-            return self.rag_pipeline.generate_response(query, relevant_docs)
-        else:
-            return self.rag_pipeline.generate_conversational_response(query, relevant_docs)
-
     def display_tech_updates(self):
         with st.sidebar:
             st.header("Latest Tech Updates")
@@ -76,7 +74,7 @@ class TechRAGApp:
 
             st.radio(
                 "Choose Response Style",
-                options=["Structured", "Conversational"],
+                options=["Structured", "Conversational", "Both"],
                 index=0,
                 key="response_style"
             )
@@ -106,15 +104,30 @@ class TechRAGApp:
             "response": None
         })
 
-        with st.spinner("Analyzing latest tech updates..."):
-            response = self.process_query(query)
-            st.session_state.chat_history[-1]["response"] = response
-
+        if not st.session_state.vector_store_ready:
+            response = "Please fetch latest tech updates first."
+            st.markdown(response)
+        else:
+            relevant_docs = self.vector_store.similarity_search(query, k=5)
+            style = st.session_state.response_style
+            if style == 'Both':
+                # Both answers come back from one concurrent batch
+                results = self.rag_pipeline.generate_both_styles(query, relevant_docs)
+                response = (f"**Structured**\n\n{results['structured']}\n\n---\n\n"
+                            f"**Conversational**\n\n{results['conversational']}")
+                st.markdown(response)
+            else:
+                # Render tokens as they arrive instead of waiting for the full answer
+                response = st.write_stream(
+                    self.rag_pipeline.stream_response(query, relevant_docs, conversational=style != 'Structured')
+                )
+
+        st.session_state.chat_history[-1]["response"] = response
         self.display_chat_history()
 
     def display_chat_history(self):
         st.subheader("Conversation")
-        for chat in reversed(st.session_state.chat_history[-5:]):
+        for chat in islice(reversed(st.session_state.chat_history), 5):
             st.markdown(f"You: {chat['query']}")
             if chat['response']:
                 st.markdown(f"Assistant: {chat['response']}")
@@ -1,26 +1,61 @@
+import asyncio
+import hashlib
 import os
-from openai import OpenAI  # ✅ For OpenAI v1+
+import sqlite3
+import string
+import time
+from openai import OpenAI, AsyncOpenAI  # ✅ For OpenAI v1+
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 from dataclasses import dataclass
 from datetime import datetime
 
 load_dotenv()
 
-@dataclass
-class RAGContext:
-    query: str
-    retrieved_docs: List[Dict[str, Any]]
-    response: str
-    sources: List[str]
-    timestamp: datetime
+# Compiled once at import so per-query context assembly is a single
+# format_map + join instead of repeated f-string construction
+_DOC_TMPL = """Document {i}:
+Title: {title}
+Source: {source}
+Content: {content}
+Relevance Score: {score:.3f}
+---"""
 
-class RAGPipeline:
-    def __init__(self, model_name="gpt-3.5-turbo"):
-        self.model_name = model_name
-        self.client = OpenAI()  # ✅ Automatically uses OPENAI_API_KEY from .env
+# Compiled once at import. The fixed instructions come before the variable
+# query/context so the prompt prefix stays byte-stable across calls and
+# OpenAI's automatic prompt caching can reuse it
+_USER_TPL = string.Template("""
+Based on the recent tech updates provided below, please answer the user's question. Include:
+1. Direct answer to the question
+2. Relevant details from the sources
+3. Recent developments mentioned in the context
+4. Technical insights and implications
+5. Actionable recommendations if applicable
+
+Focus on information from the provided context and cite sources appropriately.
+
+USER QUESTION: $query
+
+RECENT TECH CONTEXT:
+$context
+""")
 
-        self.system_prompt = """You are an expert AI assistant specialized in providing accurate, up-to-date information about technology developments, programming, software engineering, and tech industry news.
+# Frozen at module scope so the system message is byte-identical on every
+# call: it always leads the message list, maximizing server-side prefix
+# cache hits
+_SYSTEM_PROMPT = """You are an expert AI assistant specialized in providing accurate, up-to-date information about technology developments, programming, software engineering, and tech industry news.
 
 Your role is to:
 1. Analyze the provided context from recent tech sources
@@ -38,25 +73,138 @@ Guidelines:
 - Stay focused on technology, programming, and industry developments
 - Be concise but comprehensive"""
 
-    def generate_response(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> str:
-        if not retrieved_docs:
-            return "I don't have any recent tech updates to answer your question. Please refresh the tech updates first."
 
+@dataclass
+class RAGContext:
+    query: str
+    retrieved_docs: List[Dict[str, Any]]
+    response: str
+    sources: List[str]
+    timestamp: datetime
+
+class RAGPipeline:
+    def __init__(self, model_name="gpt-3.5-turbo", max_concurrency: int = 4,
+                 cache_dir: str = "./chroma_db", cache_ttl: int = 24 * 3600):
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+        self.client = OpenAI()  # ✅ Automatically uses OPENAI_API_KEY from .env
+
+        # Persistent response cache next to the vector data, so identical
+        # queries survive app restarts without an OpenAI round-trip
+        os.makedirs(cache_dir, exist_ok=True)
+        self._resp_cache = sqlite3.connect(
+            os.path.join(cache_dir, "resp_cache.db"),
+            check_same_thread=False
+        )
+        self._resp_cache.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+        )
+        self._resp_cache.commit()
+
+        self.system_prompt = _SYSTEM_PROMPT
+        # Tokenized once at init; a local inference backend can feed these
+        # ids directly instead of re-tokenizing the prompt per query
+        self._system_tokens = self._tokenize_system_prompt()
+
+    def _tokenize_system_prompt(self) -> Optional[List[int]]:
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        try:
+            encoding = tiktoken.encoding_for_model(self.model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return encoding.encode(self.system_prompt)
+
+    def _structured_request(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the chat request for the structured answer style"""
         context = self._prepare_context(retrieved_docs)
         user_prompt = self._create_user_prompt(query, context)
+        return {
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 1000
+        }
+
+    def _conversational_request(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the chat request for the conversational answer style"""
+        context = self._prepare_context(retrieved_docs)
+        prompt = f"""Here are some recent updates:\n{context}\n\nUser question: {query}\n\nPlease answer the question in a natural and conversational tone, keeping it simple and easy to understand."""
+        return {
+            "messages": [
+                {"role": "system", "content": "You're a helpful tech assistant who answers in a friendly tone."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 800
+        }
+
+    def _cache_key(self, query: str, retrieved_docs: List[Dict[str, Any]], style: str) -> str:
+        """Stable key over the query, the retrieved doc set and the style"""
+        doc_ids = ",".join(sorted(doc.get('url', '') for doc in retrieved_docs))
+        raw = f"{query}|{doc_ids}|{style}".encode()
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh64(raw).hexdigest()
+        return hashlib.sha1(raw).hexdigest()
 
+    def _cached_response(self, key: str) -> Optional[str]:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
+            row = self._resp_cache.execute(
+                "SELECT response FROM responses WHERE key = ? AND ts > ?",
+                (key, int(time.time()) - self.cache_ttl)
+            ).fetchone()
+            return row[0] if row else None
+        except Exception:
+            return None
+
+    def _store_response(self, key: str, response: str) -> None:
+        try:
+            self._resp_cache.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, response, int(time.time()))
             )
-            generated_response = response.choices[0].message.content
-            return self._format_response_with_sources(generated_response, retrieved_docs)
+            self._resp_cache.commit()
+        except Exception as e:
+            print(f"Error caching response: {e}")
+
+    def _run_llm_batch(self, requests: List[Dict[str, Any]]) -> List[str]:
+        """Run several chat completions concurrently and return their texts"""
+        return asyncio.run(self._arun_llm_batch(requests))
+
+    async def _arun_llm_batch(self, requests: List[Dict[str, Any]]) -> List[str]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Fresh client per batch: asyncio.run closes its loop on return, and
+        # a shared client's pooled connections would stay bound to that dead
+        # loop and break the next batch in the process
+        async with AsyncOpenAI() as client:
+            async def run_one(request: Dict[str, Any]) -> str:
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        model=self.model_name,
+                        **request
+                    )
+                    return response.choices[0].message.content
+
+            return await asyncio.gather(*[run_one(request) for request in requests])
+
+    def generate_response(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> str:
+        if not retrieved_docs:
+            return "I don't have any recent tech updates to answer your question. Please refresh the tech updates first."
+
+        key = self._cache_key(query, retrieved_docs, "structured")
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
+
+        try:
+            generated_response = self._run_llm_batch([self._structured_request(query, retrieved_docs)])[0]
+            response = self._format_response_with_sources(generated_response, retrieved_docs)
+            self._store_response(key, response)
+            return response
 
         except Exception as e:
             return f"Error generating response: {str(e)}. Please check your OpenAI API key and try again."
@@ -65,56 +213,104 @@ Guidelines:
         if not retrieved_docs:
             return "I couldn't find any recent updates to answer your question. Try refreshing the tech news."
 
-        context = self._prepare_context(retrieved_docs)
-        prompt = f"""Here are some recent updates:\n{context}\n\nUser question: {query}\n\nPlease answer the question in a natural and conversational tone, keeping it simple and easy to understand."""
+        key = self._cache_key(query, retrieved_docs, "conversational")
+        cached = self._cached_response(key)
+        if cached is not None:
+            return cached
 
         try:
-            response = self.client.chat.completions.create(
+            response = self._run_llm_batch([self._conversational_request(query, retrieved_docs)])[0].strip()
+            self._store_response(key, response)
+            return response
+
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+    def stream_response(self, query: str, retrieved_docs: List[Dict[str, Any]], conversational: bool = False):
+        """Yield the answer incrementally so the UI renders from the first token"""
+        if not retrieved_docs:
+            yield "I don't have any recent tech updates to answer your question. Please refresh the tech updates first."
+            return
+
+        style = "conversational" if conversational else "structured"
+        key = self._cache_key(query, retrieved_docs, style)
+        cached = self._cached_response(key)
+        if cached is not None:
+            # Repeat query: replay the stored answer without an API call
+            yield cached
+            return
+
+        if conversational:
+            request = self._conversational_request(query, retrieved_docs)
+        else:
+            request = self._structured_request(query, retrieved_docs)
+
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=[
-                    {"role": "system", "content": "You're a helpful tech assistant who answers in a friendly tone."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=800
+                stream=True,
+                **request
             )
-            return response.choices[0].message.content.strip()
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+
+            # Sources are only known once the answer is complete
+            if not conversational:
+                footer = self._sources_footer(retrieved_docs)
+                parts.append(footer)
+                yield footer
+
+            # Persist only complete answers; errors must stay uncached
+            self._store_response(key, "".join(parts))
 
         except Exception as e:
-            return f"Error: {str(e)}"
+            yield f"Error generating response: {str(e)}. Please check your OpenAI API key and try again."
 
-    def _prepare_context(self, retrieved_docs: List[Dict[str, Any]]) -> str:
-        context_parts = []
-        for i, doc in enumerate(retrieved_docs, 1):
-            doc_context = f"""Document {i}:
-Title: {doc.get('title', 'No title')}
-Source: {doc.get('source', 'Unknown')}
-Content: {doc.get('content', '')[:800]}...
-Relevance Score: {doc.get('similarity_score', 0):.3f}
----"""
-            context_parts.append(doc_context)
-        return "\n".join(context_parts)
+    def generate_both_styles(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Generate the structured and conversational answers in one concurrent batch"""
+        if not retrieved_docs:
+            message = "I don't have any recent tech updates to answer your question. Please refresh the tech updates first."
+            return {"structured": message, "conversational": message}
 
-    def _create_user_prompt(self, query: str, context: str) -> str:
-        return f"""
-Based on the following recent tech updates and information, please answer the user's question:
+        try:
+            structured, conversational = self._run_llm_batch([
+                self._structured_request(query, retrieved_docs),
+                self._conversational_request(query, retrieved_docs)
+            ])
+            return {
+                "structured": self._format_response_with_sources(structured, retrieved_docs),
+                "conversational": conversational.strip()
+            }
 
-USER QUESTION: {query}
+        except Exception as e:
+            error = f"Error generating response: {str(e)}. Please check your OpenAI API key and try again."
+            return {"structured": error, "conversational": error}
 
-RECENT TECH CONTEXT:
-{context}
+    def _prepare_context(self, retrieved_docs: List[Dict[str, Any]]) -> str:
+        def doc_entry(i: int, doc: Dict[str, Any]) -> str:
+            content = doc.get('content', '')
+            if len(content) > 800:
+                content = content[:800] + "..."
+            return _DOC_TMPL.format_map({
+                "i": i,
+                "title": doc.get('title', 'No title'),
+                "source": doc.get('source', 'Unknown'),
+                "content": content,
+                "score": doc.get('similarity_score', 0)
+            })
 
-Please provide a comprehensive answer based on the provided context. Include:
-1. Direct answer to the question
-2. Relevant details from the sources
-3. Recent developments mentioned in the context
-4. Technical insights and implications
-5. Actionable recommendations if applicable
+        return "\n".join(doc_entry(i, doc) for i, doc in enumerate(retrieved_docs, 1))
 
-Focus on information from the provided context and cite sources appropriately.
-"""
+    def _create_user_prompt(self, query: str, context: str) -> str:
+        return _USER_TPL.substitute(query=query, context=context)
 
     def _format_response_with_sources(self, response: str, retrieved_docs: List[Dict[str, Any]]) -> str:
+        return response + self._sources_footer(retrieved_docs)
+
+    def _sources_footer(self, retrieved_docs: List[Dict[str, Any]]) -> str:
         sources_section = "\n\n📚 **Sources:**\n"
         unique_sources = {}
 
@@ -136,4 +332,4 @@ Focus on information from the provided context and cite sources appropriately.
                     links.append(article['title'][:50] + "...")
             sources_section += ", ".join(links) + "\n"
 
-        return response + sources_section
+        return sources_section
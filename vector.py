@@ -1,16 +1,102 @@
 import chromadb
 from chromadb.config import Settings
+import faiss
 import hashlib
-from datetime import datetime
+from pathlib import Path
+from datetime import datetime, timedelta
 from typing import List, Dict , Any , Optional
 from sentence_transformers import SentenceTransformer
 import numpy as np
 import json
 import os
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import onnxruntime
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+# Module-level singletons so repeated construction (e.g. Streamlit reruns)
+# does not reload the embedding model or re-open the persisted index
+_MODEL_CACHE: Dict[str, Any] = {}
+_STORE_CACHE: Dict[str, "VectorStore"] = {}
+
+
+class OnnxMiniLMEncoder:
+    """Int8 ONNX Runtime MiniLM encoder exposing the same encode() surface as SentenceTransformer"""
+
+    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', cache_dir: str = "./onnx_minilm"):
+        cache_path = Path(cache_dir)
+        int8_path = cache_path / "model_int8.onnx"
+
+        if not int8_path.exists():
+            cache_path.mkdir(parents=True, exist_ok=True)
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name,
+                export=True,
+                provider='CPUExecutionProvider'
+            )
+            model.save_pretrained(cache_path)
+            # Dynamic int8 quantization halves weight bytes and lets ORT
+            # dispatch VNNI int8 kernels on supporting CPUs
+            quantize_dynamic(str(cache_path / "model.onnx"), str(int8_path), weight_type=QuantType.QInt8)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.session = onnxruntime.InferenceSession(str(int8_path), providers=['CPUExecutionProvider'])
+        self._input_names = {session_input.name for session_input in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = True, show_progress_bar: bool = False) -> np.ndarray:
+        """Tokenize, run the quantized session and mean-pool in batches"""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors='np'
+            )
+            feed = {name: value for name, value in encoded.items() if name in self._input_names}
+            hidden = self.session.run(None, feed)[0]
+
+            mask = encoded['attention_mask'][:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled)
+
+        embeddings = np.vstack(batches).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def get_embedding_model(model_name: str = 'all-MiniLm-L6-v2'):
+    """Return a process-wide shared encoder, preferring the int8 ONNX backend"""
+    if model_name not in _MODEL_CACHE:
+        model = None
+        if ONNX_AVAILABLE:
+            try:
+                model = OnnxMiniLMEncoder()
+            except Exception as e:
+                print(f" Error loading ONNX encoder, falling back to SentenceTransformer: {e}")
+        if model is None:
+            model = SentenceTransformer(model_name)
+        _MODEL_CACHE[model_name] = model
+    return _MODEL_CACHE[model_name]
+
 
 class VectorStore:
-    def __init__(self, collection_name:str = "tech_updates", persist_directory:str = "./chroma_db"):
+    def __init__(self, collection_name:str = "tech_updates", persist_directory:str = "./chroma_db", embedding_model: Optional[Any] = None):
         self.collection_name = collection_name
         self.persist_directory = persist_directory
         self.client = chromadb.PersistentClient(
@@ -20,8 +106,16 @@ class VectorStore:
                 allow_reset = True
             )
         )
-        self.embedding_model = SentenceTransformer('all-MiniLm-L6-v2')
+        self.embedding_model = embedding_model if embedding_model is not None else get_embedding_model()
+        self._emb_cache_dir = Path(persist_directory) / "emb_cache"
+        self._emb_cache_dir.mkdir(parents=True, exist_ok=True)
         self.collection = self._get_or_create_collection()
+        self._known_ids = self._load_known_ids()
+        self._faiss_dim = 384
+        self._pq_threshold = 10000
+        self._index_path = Path(persist_directory) / "faiss_hnsw.index"
+        self._faiss_meta = []
+        self._faiss_index = self._load_faiss_index()
         print(f"Vector store initialized with {self.collection.count()} documents")
 
 
@@ -31,128 +125,271 @@ class VectorStore:
             print(f"using existing collection name: {self.collection_name}")
 
         except:
+            # Embeddings are L2-normalized at encode time, so inner product
+            # equals cosine without the per-comparison normalization
             collection = self.client.create_collection(
                 name = self.collection_name,
-                metadata = {"hnsw:space": "cosine"}
+                metadata = {"hnsw:space": "ip"}
             )
             print(f" created new collection: {self.collection_name}")
 
         return collection
-    
-    def add_documents(self, tech_updates:List[any])-> None:
+
+    def _new_faiss_index(self, expected_count: int = 0):
+        """Create an empty index sized for the expected corpus"""
+        if expected_count > self._pq_threshold:
+            # Beyond ~10k docs, product quantization compresses each vector
+            # to 48-byte codes instead of 1.5KB of FP32
+            index = faiss.index_factory(self._faiss_dim, "IVF1024,PQ48", faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = 16
+            return index
+
+        index = faiss.IndexHNSWFlat(self._faiss_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = 64
+        return index
+
+    def _load_faiss_index(self):
+        """Load the persisted FAISS index, rebuilding it from the collection if stale"""
+        try:
+            stored = self.collection.get(include=['embeddings', 'documents', 'metadatas'])
+        except Exception as e:
+            print(f" Error loading stored documents for FAISS index: {e}")
+            return self._new_faiss_index()
+
+        self._faiss_meta = [
+            {'content': doc, 'metadata': metadata or {}}
+            for doc, metadata in zip(stored['documents'] or [], stored['metadatas'] or [])
+        ]
+        self._backfill_timestamp_epoch(stored['ids'] or [], [entry['metadata'] for entry in self._faiss_meta])
+
+        if self._index_path.exists():
+            try:
+                index = faiss.read_index(str(self._index_path))
+                outgrown = (index.ntotal > self._pq_threshold
+                            and isinstance(index, faiss.IndexHNSWFlat))
+                if index.ntotal == len(self._faiss_meta) and not outgrown:
+                    return index
+            except Exception as e:
+                print(f" Error reading FAISS index: {e}")
+
+        index = self._new_faiss_index(len(self._faiss_meta))
+        if self._faiss_meta:
+            embeddings = np.ascontiguousarray(stored['embeddings'], dtype=np.float32)
+            faiss.normalize_L2(embeddings)
+            if not index.is_trained:
+                index.train(embeddings[:5000])
+            index.add(embeddings)
+            self._save_faiss_index(index)
+        return index
+
+    def _backfill_timestamp_epoch(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Add timestamp_epoch to documents ingested before the field existed
+
+        Chroma's $gt/$lt filters exclude documents missing the filtered
+        field, so without the backfill legacy documents would never match
+        recency queries or be expired by delete_old_documents.
+        """
+        patch_ids = []
+        patch_metas = []
+        for doc_id, metadata in zip(ids, metadatas):
+            if 'timestamp_epoch' in metadata or not metadata.get('timestamp'):
+                continue
+            try:
+                epoch = int(datetime.fromisoformat(metadata['timestamp']).timestamp())
+            except ValueError:
+                continue
+            # In-place so the shared _faiss_meta dicts pick it up too
+            metadata['timestamp_epoch'] = epoch
+            patch_ids.append(doc_id)
+            patch_metas.append(metadata)
+
+        if patch_ids:
+            try:
+                self.collection.update(ids=patch_ids, metadatas=patch_metas)
+                print(f" Backfilled timestamp_epoch on {len(patch_ids)} documents")
+            except Exception as e:
+                print(f" Error backfilling timestamp_epoch: {e}")
+
+    def _save_faiss_index(self, index) -> None:
+        """Persist the FAISS index next to the Chroma data"""
+        try:
+            faiss.write_index(index, str(self._index_path))
+        except Exception as e:
+            print(f" Error writing FAISS index: {e}")
+
+    def _add_to_faiss_index(self, embeddings: np.ndarray, documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Append new vectors and their metadata to the in-memory index"""
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        self._faiss_index.add(vectors)
+        for doc, metadata in zip(documents, metadatas):
+            self._faiss_meta.append({'content': doc, 'metadata': metadata})
+
+        if (self._faiss_index.ntotal > self._pq_threshold
+                and isinstance(self._faiss_index, faiss.IndexHNSWFlat)):
+            # Corpus outgrew the flat HNSW index; rebuild as IVF-PQ
+            self._faiss_index = self._load_faiss_index()
+        else:
+            self._save_faiss_index(self._faiss_index)
+
+    def add_documents(self, tech_updates:List[Any])-> None:
         if not tech_updates:
             return
         documents = []
         metadatas=[]
         ids=[]
 
-        for update in tech_updates:
-            doc_text =f"{update.title}\n\n{update.content}\n\nSource:{update.source}"
-            doc_id = self.create_doc_id(update.url, update.timestamp)
-            if self._document_exists(doc_id):
+        candidate_ids = [self.create_doc_id(update.url, update.timestamp) for update in tech_updates]
+
+        for update, doc_id in zip(tech_updates, candidate_ids):
+            if doc_id in self._known_ids:
                 continue
+            doc_text =f"{update.title}\n\n{update.content}\n\nSource:{update.source}"
             documents.append(doc_text)
             metadatas.append({
                 "title":update.title,
                 "url":update.url,
                 "source":update.source,
                 "timestamp":update.timestamp.isoformat(),
+                "timestamp_epoch": int(update.timestamp.timestamp()),
                 "summary": update.summary
             })
             ids.append(doc_id)
         if documents:
+            embeddings = self._encode_documents(documents)
             try:
                 self.collection.add(
                 documents=documents,
+                embeddings=embeddings.tolist(),
                 metadatas=metadatas,
                 ids=ids
             )
+                self._known_ids.update(ids)
+                self._add_to_faiss_index(embeddings, documents, metadatas)
                 print(f"{len(documents)}Added documents to the vector store")
             except Exception as e:
                 print("documents are not added to vector store")
 
+    def _encode_documents(self, documents: List[str]) -> np.ndarray:
+        """Encode documents, reusing on-disk cached embeddings by content hash"""
+        hashes = [hashlib.sha256(doc.encode()).hexdigest() for doc in documents]
+        embeddings = [None] * len(documents)
+
+        miss_indices = []
+        for i, h in enumerate(hashes):
+            cache_file = self._emb_cache_dir / f"{h}.npy"
+            if cache_file.exists():
+                embeddings[i] = np.load(cache_file, mmap_mode='r')
+            else:
+                miss_indices.append(i)
+
+        if miss_indices:
+            # One batched forward pass through the encoder so Chroma
+            # does not embed each document individually on insert
+            new_embeddings = self.embedding_model.encode(
+                [documents[i] for i in miss_indices],
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            for i, embedding in zip(miss_indices, new_embeddings):
+                embeddings[i] = embedding
+                try:
+                    np.save(self._emb_cache_dir / f"{hashes[i]}.npy", embedding)
+                except Exception as e:
+                    print(f" Error caching embedding: {e}")
+
+        return np.stack(embeddings)
+
     def create_doc_id(self, url: str, timestamp: datetime) -> str:
         """Create unique document ID"""
-        unique_string = f"{url}_{timestamp.isoformat()}"
-        return hashlib.md5(unique_string.encode()).hexdigest()
+        unique_string = f"{url}_{timestamp.isoformat()}".encode()
+        if XXHASH_AVAILABLE:
+            # No cryptographic property needed for a stable ID, so prefer
+            # the SIMD-accelerated hash
+            return xxhash.xxh128(unique_string).hexdigest()
+        return hashlib.md5(unique_string).hexdigest()
 
 
-    def _document_exists(self, doc_id: str) -> bool:
-        """Check if document already exists"""
+    def _load_known_ids(self) -> set:
+        """Load all stored document IDs once so dedup is a pure set lookup"""
         try:
-            result = self.collection.get(ids=[doc_id])
-            return len(result['ids']) > 0
+            return set(self.collection.get(include=[])['ids'])
         except:
-            return False
+            return set()
     def similarity_search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar documents"""
+        if self._faiss_index.ntotal == 0:
+            return []
         try:
-            # Query the collection
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=k,
-                include=['documents', 'metadatas', 'distances']
+            # Query the in-memory FAISS index
+            query_vec = self.embedding_model.encode(
+                [query],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
             )
-            
+            query_vec = np.ascontiguousarray(query_vec, dtype=np.float32)
+            scores, indices = self._faiss_index.search(query_vec, min(k, self._faiss_index.ntotal))
+
             # Format results
             formatted_results = []
-            if results['documents'] and results['documents'][0]:
-                for i, doc in enumerate(results['documents'][0]):
-                    metadata = results['metadatas'][0][i] if results['metadatas'] and results['metadatas'][0] else {}
-                    distance = results['distances'][0][i] if results['distances'] and results['distances'][0] else 1.0
-                    
-                    formatted_results.append({
-                        'content': doc,
-                        'metadata': metadata,
-                        'similarity_score': 1 - distance,  # Convert distance to similarity
-                        'title': metadata.get('title', 'No title'),
-                        'source': metadata.get('source', 'Unknown'),
-                        'url': metadata.get('url', ''),
-                        'timestamp': metadata.get('timestamp', ''),
-                        'summary': metadata.get('summary', '')
-                    })
-            
+            for score, idx in zip(scores[0], indices[0]):
+                if idx < 0:
+                    continue
+                entry = self._faiss_meta[idx]
+                metadata = entry['metadata']
+
+                formatted_results.append({
+                    'content': entry['content'],
+                    'metadata': metadata,
+                    'similarity_score': float(score),  # Inner product of unit vectors == cosine
+                    'title': metadata.get('title', 'No title'),
+                    'source': metadata.get('source', 'Unknown'),
+                    'url': metadata.get('url', ''),
+                    'timestamp': metadata.get('timestamp', ''),
+                    'summary': metadata.get('summary', '')
+                })
+
             return formatted_results
-        
+
         except Exception as e:
             print(f" Error in similarity search: {e}")
             return []
-    def get_recent_documents(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_recent_documents(self, limit: int = 10, max_age_days: int = 7) -> List[Dict[str, Any]]:
         """Get most recent documents"""
         try:
-            # Get all documents
-            all_docs = self.collection.get(
+            # Filter on the integer epoch in the storage layer instead of
+            # pulling every document and parsing timestamps in Python
+            cutoff_epoch = int((datetime.now() - timedelta(days=max_age_days)).timestamp())
+            recent_docs = self.collection.get(
+                where={"timestamp_epoch": {"$gt": cutoff_epoch}},
                 include=['documents', 'metadatas']
             )
-            
-            if not all_docs['documents']:
+
+            if not recent_docs['documents']:
                 return []
-            
-            # Sort by timestamp (newest first)
+
             docs_with_metadata = []
-            for i, doc in enumerate(all_docs['documents']):
-                metadata = all_docs['metadatas'][i] if all_docs['metadatas'] else {}
-                timestamp_str = metadata.get('timestamp', '')
-                
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str) if timestamp_str else datetime.min
-                except:
-                    timestamp = datetime.min
-                
+            for doc, metadata in zip(recent_docs['documents'], recent_docs['metadatas'] or []):
+                metadata = metadata or {}
                 docs_with_metadata.append({
                     'content': doc,
                     'metadata': metadata,
-                    'timestamp': timestamp,
+                    'timestamp': metadata.get('timestamp', ''),
+                    'timestamp_epoch': metadata.get('timestamp_epoch', 0),
                     'title': metadata.get('title', 'No title'),
                     'source': metadata.get('source', 'Unknown'),
                     'url': metadata.get('url', ''),
                     'summary': metadata.get('summary', '')
                 })
-            
-            # Sort by timestamp and return top results
-            docs_with_metadata.sort(key=lambda x: x['timestamp'], reverse=True)
+
+            # Only the small filtered slice is sorted in Python
+            docs_with_metadata.sort(key=lambda x: x['timestamp_epoch'], reverse=True)
             return docs_with_metadata[:limit]
-        
+
         except Exception as e:
             print(f" Error getting recent documents: {e}")
             return []
@@ -216,8 +453,13 @@ class VectorStore:
             self.client.delete_collection(name=self.collection_name)
             self.collection = self.client.create_collection(
                 name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
+                metadata={"hnsw:space": "ip"}
             )
+            self._known_ids = set()
+            self._faiss_index = self._new_faiss_index()
+            self._faiss_meta = []
+            if self._index_path.exists():
+                self._index_path.unlink()
             print(f" Cleared collection: {self.collection_name}")
         except Exception as e:
             print(f" Error clearing collection: {e}")
@@ -225,30 +467,33 @@ class VectorStore:
     def delete_old_documents(self, days_old: int = 7) -> None:
         """Delete documents older than specified days"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days_old)
-            
-            # Get all documents
-            all_docs = self.collection.get(include=['metadatas'])
-            
-            old_doc_ids = []
-            if all_docs['metadatas']:
-                for i, metadata in enumerate(all_docs['metadatas']):
-                    timestamp_str = metadata.get('timestamp', '')
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str)
-                        if timestamp < cutoff_date:
-                            old_doc_ids.append(all_docs['ids'][i])
-                    except:
-                        continue
-            
+            cutoff_epoch = int((datetime.now() - timedelta(days=days_old)).timestamp())
+
+            # Let the storage layer find expired documents by epoch
+            old_docs = self.collection.get(
+                where={"timestamp_epoch": {"$lt": cutoff_epoch}},
+                include=[]
+            )
+            old_doc_ids = old_docs['ids']
+
             # Delete old documents
             if old_doc_ids:
                 self.collection.delete(ids=old_doc_ids)
+                self._known_ids.difference_update(old_doc_ids)
+                # HNSW does not support removal, so rebuild from the collection
+                self._faiss_index = self._load_faiss_index()
                 print(f" Deleted {len(old_doc_ids)} old documents")
         
         except Exception as e:
             print(f" Error deleting old documents: {e}")
 
+def get_vector_store(collection_name: str = "tech_updates", persist_directory: str = "./chroma_db") -> "VectorStore":
+    """Return a process-wide shared VectorStore keyed by persist directory"""
+    if persist_directory not in _STORE_CACHE:
+        _STORE_CACHE[persist_directory] = VectorStore(collection_name, persist_directory)
+    return _STORE_CACHE[persist_directory]
+
+
 # Example usage
 if __name__ == "__main__":
     # Test vector store
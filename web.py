@@ -1,13 +1,51 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+
+import aiohttp
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
 from datetime import datetime, timedelta
 import re
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
-import time
+from io import BytesIO
+from typing import Iterable, Iterator, List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 
-@dataclass
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+# Last-resort tag stripper for degenerate input or missing parsers,
+# compiled once at import
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Whitespace collapser shared by the per-entry cleaning loop
+_WS_RE = re.compile(r'\s+')
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True, frozen=True)
 class TechUpdate:
     title: str
     content: str
@@ -16,28 +54,157 @@ class TechUpdate:
     timestamp: datetime
     summary: str
 
+
+def _clean_and_summarize(html_content: str):
+    """Extract clean text and its first-sentence summary in one pass
+
+    Fuses the old _clean_html + _create_summary pair so each entry's
+    HTML is parsed once and the cleaned string is scanned once.
+    """
+    if not html_content:
+        return "", "No content available"
+
+    if SELECTOLAX_AVAILABLE:
+        # C-based parser, much faster than a full DOM build
+        text = HTMLParser(html_content).text(separator=' ')
+    elif LXML_AVAILABLE:
+        try:
+            # Single C call into libxml2, no Python-level node wrapping
+            text = lxml.html.fromstring(html_content).text_content()
+        except Exception:
+            text = _TAG_RE.sub(' ', html_content)
+    else:
+        text = _TAG_RE.sub(' ', html_content)
+    text = _WS_RE.sub(' ', text).strip()
+
+    if len(text) > 500:
+        text = text[:500] + "..."
+
+    if not text:
+        return "", "No content available"
+
+    # Single C-level scan for the first sentence; avoids materializing
+    # the full split() list just to read element zero
+    idx = text.find('.')
+    if idx > 20:
+        summary = text[:idx + 1]
+    else:
+        summary = text[:100] + "..." if len(text) > 100 else text
+
+    return text, summary
+
+
+def _parse_rss_items_lxml(source: str, body: bytes, max_items: int) -> List[TechUpdate]:
+    """Extract RSS <item>s by streaming the bytes through libxml2
+
+    iterparse frees each element after use and stops at max_items, so
+    CPU and memory stay bounded regardless of feed size — far cheaper
+    than feedparser's full Python entry construction.
+    """
+    updates = []
+    now = datetime.now()
+
+    for _, elem in etree.iterparse(BytesIO(body), events=('end',), tag='item', recover=True):
+        content, summary = _clean_and_summarize(elem.findtext('description') or '')
+
+        update = TechUpdate(
+            title=elem.findtext('title') or '',
+            content=content,
+            url=elem.findtext('link') or '',
+            source=source,
+            timestamp=now,
+            summary=summary
+        )
+        updates.append(update)
+        elem.clear()
+        if len(updates) >= max_items:
+            break
+
+    return updates
+
+
+def _parse_rss_bytes(source: str, body: bytes, max_items: int = 15) -> List[TechUpdate]:
+    """Parse raw feed bytes into TechUpdates
+
+    Module-level and picklable so the parse stage can run in worker
+    processes. Plain RSS goes through the streaming lxml path;
+    feedparser remains the fallback for Atom and malformed feeds.
+    """
+    if LXML_AVAILABLE:
+        try:
+            updates = _parse_rss_items_lxml(source, body, max_items)
+            if updates:
+                return updates
+        except Exception as e:
+            logger.warning("lxml feed parse failed for %s, falling back to feedparser: %s", source, e)
+
+    feed = feedparser.parse(body)
+    updates = []
+    # One clock read per batch; also gives the batch a single
+    # atomic timestamp for the recency sort
+    now = datetime.now()
+
+    for entry in feed.entries[:max_items]:
+        content, summary = _clean_and_summarize(entry.get('summary', entry.get('description', '')))
+
+        update = TechUpdate(
+            title=entry.title,
+            content=content,
+            url=entry.link,
+            source=source,
+            timestamp=now,
+            summary=summary
+        )
+        updates.append(update)
+
+    return updates
+
 class TechNewsRetriever:
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 5):
+        self.max_concurrency = max_concurrency
+        # url -> (etag, last_modified, parsed updates) for conditional GETs
+        self._feed_cache: Dict[str, Any] = {}
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            # requests decompresses transparently; this just cuts bytes on the wire
+            'Accept-Encoding': 'gzip, deflate'
         })
 
+        # Size the pool for the parallel fetchers and retry transient
+        # failures so TLS setup happens once per host for the process
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Where a source supports it, the item budget is pushed into the
+        # URL so the server never sends entries we would drop anyway
         self.sources = {
             'hackernews': {
-                'url': 'https://hnrss.org/frontpage?count=20',
-                'type': 'rss'
+                'url': 'https://hnrss.org/frontpage?count=15',
+                'type': 'rss',
+                'max_items': 15
             },
             'techcrunch': {
                 'url': 'https://techcrunch.com/feed/',
-                'type': 'rss'
+                'type': 'rss',
+                'max_items': 15
             },
             'github_trending': {
                 'url': 'https://api.github.com/search/repositories',
                 'type': 'api'
             },
             'reddit_programming': {
-                'url': 'https://www.reddit.com/r/programming/hot.json?limit=20',
+                # A few extra over the 10 kept, to cover skipped pinned posts
+                'url': 'https://www.reddit.com/r/programming/hot.json?limit=15',
                 'type': 'api'
             }
         }
@@ -55,7 +222,7 @@ class TechNewsRetriever:
             elif source_config['type'] == 'api':
                 return self._fetch_from_api(source, source_config['url'])
         except Exception as e:
-            print(f"Error fetching from {source}: {e}")
+            logger.warning("Error fetching from %s: %s", source, e)
             return []
 
     def _fetch_from_api(self, source: str, url: str) -> List[TechUpdate]:
@@ -65,51 +232,76 @@ class TechNewsRetriever:
         elif source == "reddit_programming":
             return self._fetch_reddit_programming(url)
         else:
-            print(f"No handler implemented for API source: {source}")
+            logger.warning("No handler implemented for API source: %s", source)
             return []
 
+    def _fetch_rss_raw(self, source: str, url: str):
+        """I/O half of an RSS fetch with conditional-GET handling
+
+        Returns (body, etag, last_modified, cached_updates); body is None
+        when the server answered 304 and the cached updates are current.
+        """
+        cached = self._feed_cache.get(url)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        # Fetch through the shared session (keep-alive, custom headers)
+        # instead of letting feedparser open its own connection
+        response = self.session.get(url, headers=headers, timeout=10, stream=True)
+        if response.status_code == 304 and cached:
+            # Feed unchanged since the last fetch: no body, no parse
+            response.close()
+            return None, None, None, cached[2]
+        response.raise_for_status()
+
+        # Cap the buffered body: ~256KB covers far more than the 15
+        # entries we keep, so oversized feeds never sit in memory
+        body = response.raw.read(256 * 1024, decode_content=True)
+        response.close()
+
+        return body, response.headers.get('ETag'), response.headers.get('Last-Modified'), None
+
     def _fetch_from_rss(self, source: str, url: str) -> List[TechUpdate]:
         """Fetch from RSS feed"""
         try:
-            feed = feedparser.parse(url)
-            updates = []
-
-            for entry in feed.entries[:15]:
-                content = entry.get('summary', entry.get('description', ''))
-                content = self._clean_html(content)
-                summary = self._create_summary(content)
-
-                update = TechUpdate(
-                    title=entry.title,
-                    content=content,
-                    url=entry.link,
-                    source=source,
-                    timestamp=datetime.now(),
-                    summary=summary
-                )
-                updates.append(update)
+            body, etag, last_modified, cached_updates = self._fetch_rss_raw(source, url)
+            if body is None:
+                return cached_updates
 
+            updates = _parse_rss_bytes(source, body, self.sources[source].get('max_items', 15))
+            self._feed_cache[url] = (etag, last_modified, updates)
             return updates
         except Exception as e:
-            print(f"RSS fetch error for {source}: {e}")
+            logger.warning("RSS fetch error for %s: %s", source, e)
             return []
 
-    def _fetch_github_trending(self, url: str) -> List[TechUpdate]:
-        """Fetch trending GitHub repositories"""
+    def _github_query_params(self) -> Dict[str, Any]:
+        """Query parameters for the GitHub trending search"""
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        params = {
+        return {
             'q': f'created:>{yesterday}',
             'sort': 'stars',
             'order': 'desc',
             'per_page': 10
         }
 
-        response = self.session.get(url, params=params)
+    def _fetch_github_trending(self, url: str) -> List[TechUpdate]:
+        """Fetch trending GitHub repositories"""
+        response = self.session.get(url, params=self._github_query_params(), timeout=10)
         if response.status_code != 200:
             return []
 
-        data = response.json()
+        return self._parse_github_items(_json_loads(response.content))
+
+    def _parse_github_items(self, data: Dict[str, Any]) -> List[TechUpdate]:
+        """Build TechUpdates from a GitHub search API payload"""
         updates = []
+        now = datetime.now()
 
         for repo in data.get('items', []):
             content = f"{repo['stargazers_count']} stars | {repo['language'] or 'N/A'} | {repo['description'] or 'No description'}"
@@ -120,7 +312,7 @@ class TechNewsRetriever:
                 content=content,
                 url=repo['html_url'],
                 source='github_trending',
-                timestamp=datetime.now(),
+                timestamp=now,
                 summary=f"Trending {repo['language'] or 'repository'}: {description[:100]}..."
             )
             updates.append(update)
@@ -129,16 +321,21 @@ class TechNewsRetriever:
 
     def _fetch_reddit_programming(self, url: str) -> List[TechUpdate]:
         """Fetch hot posts from r/programming"""
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=10)
         if response.status_code != 200:
             return []
 
-        data = response.json()
+        return self._parse_reddit_posts(_json_loads(response.content))
+
+    def _parse_reddit_posts(self, data: Dict[str, Any]) -> List[TechUpdate]:
+        """Build TechUpdates from a Reddit listing payload"""
         updates = []
 
-        for post in data['data']['children'][:10]:
+        # Scan the whole limit=15 fetch so skipped pinned posts are
+        # replaced from the overfetch instead of shrinking the batch
+        for post in data['data']['children']:
             post_data = post['data']
-            if post_data.get('pinned', False):
+            if post_data.get('pinned', False) or post_data.get('stickied', False):
                 continue
 
             content = f"{post_data['score']} upvotes | {post_data['num_comments']} comments\n\n{post_data.get('selftext', '')[:300]}..."
@@ -151,57 +348,235 @@ class TechNewsRetriever:
                 summary=f"Reddit discussion: {post_data['title'][:80]}..."
             )
             updates.append(update)
+            if len(updates) >= 10:
+                break
 
         return updates
 
-    def _clean_html(self, html_content: str) -> str:
-        """Clean HTML content"""
-        if not html_content:
-            return ""
+    def _merge_by_recency(self, per_source: List[List[TechUpdate]]) -> List[TechUpdate]:
+        """List form of _iter_merged_by_recency for callers that need it all"""
+        return list(self._iter_merged_by_recency(per_source))
+
+    def _iter_merged_by_recency(self, per_source: List[List[TechUpdate]]) -> Iterator[TechUpdate]:
+        """Yield per-source batches merged newest-first without re-sorting the union
+
+        Each batch is sorted on its own (most are already timestamp-
+        homogeneous), then merged with a k-way heap: O(n log k) with k =
+        number of sources instead of O(n log n) over the concatenation.
+        Lazy end to end — the merge and dedup both stream, so nothing
+        beyond the per-source batches is ever materialized here.
+        """
+        sorted_batches = [self._sort_by_recency(updates) for updates in per_source if updates]
+        merged = heapq.merge(*sorted_batches, key=lambda u: -u.timestamp.timestamp())
+        return self._dedupe_updates(merged)
+
+    def _dedupe_updates(self, updates: Iterable[TechUpdate]) -> Iterator[TechUpdate]:
+        """Yield updates with cross-source duplicates dropped by content fingerprint
+
+        Keeps the first occurrence seen; only the fingerprint set is held,
+        not the updates themselves.
+        """
+        seen = set()
+
+        for update in updates:
+            normalized = _WS_RE.sub(' ', (update.title + update.content[:4000]).lower()).strip()
+            fingerprint = hashlib.sha1(normalized.encode()).digest()[:16]
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            yield update
 
-        soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text()
-        text = re.sub(r'\s+', ' ', text).strip()
+    def _sort_by_recency(self, updates: List[TechUpdate]) -> List[TechUpdate]:
+        """Sort updates newest-first via a vectorized timestamp argsort"""
+        if len(updates) < 2:
+            return updates
 
-        if len(text) > 500:
-            text = text[:500] + "..."
+        # One contiguous float column and a C-level sort instead of a
+        # Python key callback per comparison
+        timestamps = np.fromiter(
+            (update.timestamp.timestamp() for update in updates),
+            dtype=np.float64,
+            count=len(updates)
+        )
+        order = np.argsort(-timestamps, kind='stable')
+        return [updates[i] for i in order]
 
-        return text
+    def fetch_all_sources(self) -> List[TechUpdate]:
+        """Fetch from all configured sources in parallel and return the full list"""
+        return list(self.iter_all_sources())
+
+    def iter_all_sources(self) -> Iterator[TechUpdate]:
+        """Fetch from all configured sources in parallel, yielding updates lazily
+
+        Both fetch stages still run eagerly on first consumption and the
+        per-source batches stay alive until the merge finishes; what the
+        stream avoids is materializing the concatenated, deduped union as
+        a second full-size list on top of them.
+        """
+        per_source = []
+        raw_feeds = []  # (source, url, body, etag, last_modified)
+
+        # Stage 1: overlap all network waits in threads. RSS sources only
+        # download bytes here; their CPU-heavy parse happens in stage 2.
+        with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
+            futures = {}
+            for source, config in self.sources.items():
+                if config['type'] == 'rss':
+                    futures[executor.submit(self._fetch_rss_raw, source, config['url'])] = source
+                else:
+                    futures[executor.submit(self.fetch_from_source, source)] = source
+
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning("Error fetching from %s: %s", source, e)
+                    continue
+
+                if isinstance(result, tuple):
+                    body, etag, last_modified, cached_updates = result
+                    if body is None:
+                        per_source.append(cached_updates or [])
+                    else:
+                        raw_feeds.append((source, self.sources[source]['url'], body, etag, last_modified))
+                else:
+                    per_source.append(result or [])
+
+        if raw_feeds:
+            # Stage 2: feedparser is mostly Python and serializes on the GIL
+            # under threads, so parse the downloaded feeds in processes
+            sources = [feed[0] for feed in raw_feeds]
+            bodies = [feed[2] for feed in raw_feeds]
+            limits = [self.sources[source].get('max_items', 15) for source in sources]
+            try:
+                with ProcessPoolExecutor(max_workers=2) as pool:
+                    parsed = list(pool.map(_parse_rss_bytes, sources, bodies, limits))
+            except Exception as e:
+                logger.warning("Process-pool feed parse failed, parsing inline: %s", e)
+                parsed = [_parse_rss_bytes(source, body, limit)
+                          for source, body, limit in zip(sources, bodies, limits)]
 
-    def _create_summary(self, content: str) -> str:
-        """Create a brief summary of the content"""
-        if not content:
-            return "No content available"
+            for (source, url, body, etag, last_modified), updates in zip(raw_feeds, parsed):
+                self._feed_cache[url] = (etag, last_modified, updates)
+                per_source.append(updates)
 
-        sentences = content.split('.')
-        if sentences and len(sentences[0]) > 20:
-            return sentences[0] + "."
-        return content[:100] + "..." if len(content) > 100 else content
+        yield from self._iter_merged_by_recency(per_source)
 
-    def fetch_all_sources(self) -> List[TechUpdate]:
-        """Fetch from all configured sources"""
-        all_updates = []
+    async def _fetch_from_source_async(self, source: str, session: aiohttp.ClientSession) -> List[TechUpdate]:
+        """Async version of fetch_from_source using a shared aiohttp session"""
+        source_config = self.sources[source]
+        url = source_config['url']
 
-        for source in self.sources.keys():
-            try:
-                updates = self.fetch_from_source(source)
-                all_updates.extend(updates)
-                time.sleep(0.5)  # To respect API limits
-            except Exception as e:
-                print(f"Error fetching from {source}: {e}")
+        try:
+            if source_config['type'] == 'rss':
+                return await self._fetch_from_rss_async(source, url, session)
+            elif source == 'github_trending':
+                return await self._fetch_github_trending_async(url, session)
+            elif source == 'reddit_programming':
+                return await self._fetch_reddit_programming_async(url, session)
+            else:
+                logger.warning("No async handler implemented for source: %s", source)
+                return []
+        except Exception as e:
+            logger.warning("Error fetching from %s: %s", source, e)
+            return []
 
-        all_updates.sort(key=lambda x: x.timestamp, reverse=True)
-        return all_updates
+    async def _fetch_from_rss_async(self, source: str, url: str, session: aiohttp.ClientSession) -> List[TechUpdate]:
+        """Fetch an RSS feed without blocking the event loop
+
+        Mirrors _fetch_rss_raw: conditional GET against _feed_cache and a
+        ~256KB body cap, so the async path the app runs gets the same
+        bandwidth and memory bounds as the thread-pool path.
+        """
+        cached = self._feed_cache.get(url)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                # Feed unchanged since the last fetch: no body, no parse
+                return cached[2]
+            response.raise_for_status()
+            # Cap the buffered body: ~256KB covers far more than the 15
+            # entries we keep, so oversized feeds never sit in memory
+            body = await response.content.read(256 * 1024)
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        # feedparser is CPU-bound parsing, so keep it off the event loop
+        updates = await asyncio.to_thread(
+            _parse_rss_bytes, source, body, self.sources[source].get('max_items', 15)
+        )
+        self._feed_cache[url] = (etag, last_modified, updates)
+        return updates
+
+    async def _fetch_github_trending_async(self, url: str, session: aiohttp.ClientSession) -> List[TechUpdate]:
+        """Async fetch of trending GitHub repositories"""
+        async with session.get(url, params=self._github_query_params()) as response:
+            if response.status != 200:
+                return []
+            data = _json_loads(await response.read())
+
+        return self._parse_github_items(data)
+
+    async def _fetch_reddit_programming_async(self, url: str, session: aiohttp.ClientSession) -> List[TechUpdate]:
+        """Async fetch of hot posts from r/programming"""
+        async with session.get(url) as response:
+            if response.status != 200:
+                return []
+            data = _json_loads(await response.read())
+
+        return self._parse_reddit_posts(data)
+
+    async def fetch_all_async(self) -> List[TechUpdate]:
+        """Fetch all sources concurrently and return updates sorted by recency"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=2)
+        timeout = aiohttp.ClientTimeout(total=15)
+
+        async with aiohttp.ClientSession(
+            headers=dict(self.session.headers),
+            connector=connector,
+            timeout=timeout
+        ) as session:
+            async def fetch_bounded(source: str) -> List[TechUpdate]:
+                async with semaphore:
+                    return await self._fetch_from_source_async(source, session)
+
+            results = await asyncio.gather(
+                *[fetch_bounded(source) for source in self.sources],
+                return_exceptions=True
+            )
+
+        per_source = []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                logger.warning("Error fetching from %s: %s", source, result)
+            else:
+                per_source.append(result)
+
+        return self._merge_by_recency(per_source)
 
     def get_source_stats(self) -> Dict[str, int]:
         """Get statistics about available sources"""
         stats = {}
-        for source in self.sources.keys():
-            try:
-                updates = self.fetch_from_source(source)
-                stats[source] = len(updates)
-            except:
-                stats[source] = 0
+        with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
+            futures = {
+                executor.submit(self.fetch_from_source, source): source
+                for source in self.sources
+            }
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    stats[source] = len(future.result() or [])
+                except:
+                    stats[source] = 0
         return stats
 
 # ✅ Example Usage